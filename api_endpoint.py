@@ -1,9 +1,10 @@
 # api.py - Simple API endpoint for iOS app
-import os, sys, json, datetime as dt
+import os, sys, datetime as dt
 from pathlib import Path
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import urllib.parse
-from zoneinfo import ZoneInfo
+
+import orjson
 
 # Import your existing functions
 from main import (
@@ -46,10 +47,10 @@ class APIHandler(BaseHTTPRequestHandler):
         
         response = {
             "status": "healthy",
-            "timestamp": dt.datetime.now(ZoneInfo("America/New_York")).isoformat(),
+            "timestamp": boston_now()[0].isoformat(),
             "service": "Boston Briefing API"
         }
-        self.wfile.write(json.dumps(response).encode())
+        self.wfile.write(orjson.dumps(response))
     
     def handle_episodes(self):
         """Return list of available episodes"""
@@ -86,7 +87,7 @@ class APIHandler(BaseHTTPRequestHandler):
             "episodes": episodes[:10],  # Last 10 episodes
             "total": len(episodes)
         }
-        self.wfile.write(json.dumps(response).encode())
+        self.wfile.write(orjson.dumps(response))
     
     def handle_generate(self):
         """Generate a new episode"""
@@ -96,6 +97,10 @@ class APIHandler(BaseHTTPRequestHandler):
             self.send_header('Content-Type', 'application/json')
             self.end_headers()
             
+            # One timestamp for the greeting, file name and response
+            today, _, _ = boston_now()
+            date_str = today.strftime("%Y-%m-%d")
+            
             # Step 1: Fetch news
             print("[API] Fetching news...")
             raw_items = fetch_items()
@@ -118,42 +123,35 @@ class APIHandler(BaseHTTPRequestHandler):
             if prompt_path.exists():
                 prompt_text = prompt_path.read_text(encoding="utf-8")
             
-            script = rewrite_with_openai(prompt_text, notes)
+            script = rewrite_with_openai(prompt_text, notes, today)
             
             if not script:
                 raise Exception("Failed to generate script")
             
             # Step 4: Generate audio (optional)
-            audio_data = None
             audio_url = None
             
             if os.getenv("ELEVEN_API_KEY") and os.getenv("ELEVEN_VOICE_ID"):
                 print("[API] Generating audio...")
                 sanitized_script = sanitize_for_tts(script)
-                audio_data = tts_elevenlabs(sanitized_script)
                 
-                if audio_data:
-                    # Save audio file
-                    today = dt.datetime.now(ZoneInfo("America/New_York"))
-                    date_str = today.strftime("%Y-%m-%d")
-                    
-                    public_dir = Path("public")
-                    episodes_dir = public_dir / "episodes"
-                    episodes_dir.mkdir(parents=True, exist_ok=True)
-                    
-                    audio_filename = f"boston-briefing-{date_str}.mp3"
-                    audio_path = episodes_dir / audio_filename
-                    audio_path.write_bytes(audio_data)
-                    
+                public_dir = Path("public")
+                episodes_dir = public_dir / "episodes"
+                episodes_dir.mkdir(parents=True, exist_ok=True)
+                
+                # TTS streams directly into the episode file
+                audio_filename = f"boston-briefing-{date_str}.mp3"
+                audio_path = episodes_dir / audio_filename
+                
+                if tts_elevenlabs(sanitized_script, audio_path):
                     audio_url = f"/episodes/{audio_filename}"
                     print(f"[API] Audio saved: {audio_filename}")
             
             # Step 5: Create response
-            today = dt.datetime.now(ZoneInfo("America/New_York"))
             episode = {
-                "id": today.strftime("%Y-%m-%d"),
+                "id": date_str,
                 "title": f"Boston Briefing – {today.strftime('%B %d, %Y')}",
-                "date": today.strftime("%Y-%m-%d"),
+                "date": date_str,
                 "script": script,
                 "audioURL": audio_url,
                 "duration": 180,
@@ -166,7 +164,7 @@ class APIHandler(BaseHTTPRequestHandler):
                 "message": "Episode generated successfully"
             }
             
-            self.wfile.write(json.dumps(response).encode())
+            self.wfile.write(orjson.dumps(response))
             print("[API] Episode generation complete")
             
         except Exception as e:
@@ -182,7 +180,7 @@ class APIHandler(BaseHTTPRequestHandler):
                 "error": str(e),
                 "message": "Failed to generate episode"
             }
-            self.wfile.write(json.dumps(response).encode())
+            self.wfile.write(orjson.dumps(response))
 
 def start_api_server(port=8000):
     """Start the API server"""
@@ -1,10 +1,17 @@
 # create_api.py - Create static JSON API endpoints
-import json
 import os
 from pathlib import Path
 import datetime as dt
 from zoneinfo import ZoneInfo
 
+import orjson
+
+def write_json(path, data):
+    """Serialize with orjson and swap into place, so Pages never serves half a file"""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    os.replace(tmp, path)
+
 def create_episodes_api():
     """Create episodes.json API endpoint"""
     # Get episodes from public/episodes directory
@@ -53,8 +60,7 @@ def create_episodes_api():
     
     # Write to public/api/episodes.json
     episodes_api_path = api_dir / "episodes.json"
-    with open(episodes_api_path, "w", encoding="utf-8") as f:
-        json.dump(api_response, f, indent=2)
+    write_json(episodes_api_path, api_response)
     
     print(f"✅ Created episodes API: {episodes_api_path}")
     print(f"   Episodes: {len(episodes)}")
@@ -81,8 +87,7 @@ def create_generate_api():
     }
     
     generate_api_path = api_dir / "generate.json"
-    with open(generate_api_path, "w", encoding="utf-8") as f:
-        json.dump(generate_response, f, indent=2)
+    write_json(generate_api_path, generate_response)
     
     print(f"✅ Created generate API: {generate_api_path}")
 
@@ -100,8 +105,7 @@ def create_health_api():
     }
     
     health_api_path = api_dir / "health.json"
-    with open(health_api_path, "w", encoding="utf-8") as f:
-        json.dump(health_response, f, indent=2)
+    write_json(health_api_path, health_response)
     
     print(f"✅ Created health API: {health_api_path}")
 
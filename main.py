@@ -1,14 +1,20 @@
 # main.py - OPTIMIZED FOR NATURAL TTS & BETTER NEWS PROCESSING
-import os, sys, json, datetime as dt, re
+import os, sys, json, datetime as dt, re, time, functools, hashlib, textwrap, threading, random
+from itertools import islice
+from io import BytesIO
 from pathlib import Path
+from urllib.parse import urlsplit
 from email.utils import format_datetime
+from html import escape
 from zoneinfo import ZoneInfo
+from concurrent.futures import ThreadPoolExecutor
 
-import yaml, feedparser, requests
-from bs4 import BeautifulSoup
-from readability import Document
-import trafilatura
+import yaml, requests, orjson
+import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
 
 # -------------------- ENV / CONFIG --------------------
 ELEVEN_API_KEY  = os.getenv("ELEVEN_API_KEY", "").strip()
@@ -17,6 +23,15 @@ OPENAI_API_KEY  = os.getenv("OPENAI_API_KEY", "").strip()
 OPENAI_MODEL    = os.getenv("OPENAI_MODEL", "gpt-4o").strip()
 PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "").rstrip("/")
 MAX_ITEMS       = int(os.getenv("MAX_ITEMS", "8"))
+LSH_MIN_ITEMS   = int(os.getenv("LSH_MIN_ITEMS", "64"))
+NOTE_MAX_WORDS  = 32    # per-story cap on note length sent to GPT
+NOTES_MAX_CHARS = 6000  # cap on the whole notes block (prompt tokens = latency)
+OPENAI_FALLBACK_MODEL = os.getenv("OPENAI_FALLBACK_MODEL", "gpt-4o-mini").strip()
+# Seconds the primary model gets per attempt (one retry) before the fallback
+# model is used instead; keep it well above the primary's normal latency
+OPENAI_BACKUP_DELAY   = float(os.getenv("OPENAI_BACKUP_DELAY", "120"))
+OPENAI_MAX_INFLIGHT   = int(os.getenv("OPENAI_MAX_INFLIGHT", "2"))
+OPENAI_TIMEOUT        = float(os.getenv("OPENAI_TIMEOUT", "60"))  # per attempt; SDK default is 600s
 
 ROOT       = Path(".")
 PUBLIC_DIR = ROOT / "public"
@@ -25,20 +40,50 @@ SH_NOTES   = PUBLIC_DIR / "shownotes"
 for d in (PUBLIC_DIR, EP_DIR, SH_NOTES):
     d.mkdir(parents=True, exist_ok=True)
 
+# Local cache for re-runs (debugging, CI retries); never published.
+# Set BRIEFING_CACHE=0 to bypass it and always hit the network.
+CACHE_ENABLED     = os.getenv("BRIEFING_CACHE", "1").strip() != "0"
+CACHE_DIR         = ROOT / ".cache"
+EXTRACT_CACHE_TTL = int(os.getenv("EXTRACT_CACHE_TTL", str(6 * 3600)))
+SCRIPT_CACHE_TTL  = int(os.getenv("SCRIPT_CACHE_TTL", "3600"))
+
+# Shared HTTP session (feeds, articles, TTS): keep-alive pool sized for the
+# extraction thread pool, so same-host requests skip repeat TCP/TLS handshakes.
+# Idempotent GETs also retry transient 429/5xx; Retry-After is ignored so one
+# slow feed can't stall the run (POSTs are never retried here).
+_HTTP = requests.Session()
+_HTTP.headers["User-Agent"] = "Mozilla/5.0 (compatible; BostonBriefing/2.0)"
+_HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=16, pool_maxsize=16,
+    max_retries=Retry(
+        total=2, backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+)
+_HTTP.mount("https://", _HTTP_ADAPTER)
+_HTTP.mount("http://", _HTTP_ADAPTER)
+
 # -------------------- LOAD FEEDS --------------------
 feeds_path = ROOT / "feeds.yml"
 if feeds_path.exists():
     with open(feeds_path, "r", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f) or {}
+        # libyaml's C loader when PyYAML was built with it (same safe semantics)
+        cfg = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)) or {}
 else:
     cfg = {"sources": []}
 SOURCES = cfg.get("sources", [])
 EXCLUDE = set(str(k).lower() for k in cfg.get("exclude_keywords", []))
 LIMIT_PER = int(cfg.get("daily_limit_per_source", cfg.get("limit_per_source", 8)))
+# One alternation scanned in C instead of a Python-level `k in t` per keyword
+_EXCLUDE_RE = re.compile("|".join(map(re.escape, sorted(EXCLUDE))), re.IGNORECASE) if EXCLUDE else None
 
 # -------------------- TIME / GREETING --------------------
-def boston_now():
-    now = dt.datetime.now(ZoneInfo("America/New_York"))
+BOSTON_TZ = ZoneInfo("America/New_York")
+
+def greeting_for(now: dt.datetime) -> tuple[str, str]:
+    """Time-of-day greeting and spoken date for a Boston timestamp"""
     hour = now.hour
     if 5 <= hour < 12:
         tod = "morning"
@@ -46,99 +91,408 @@ def boston_now():
         tod = "afternoon"
     else:
         tod = "evening"
-    # Format date properly for both Windows and Unix
-    pretty_date = now.strftime("%A, %B ") + str(int(now.strftime("%d"))) + now.strftime(", %Y")
-    return now, tod, pretty_date
+    # No %-d: it isn't portable (Windows), so take the day as an int
+    pretty_date = f"{now:%A, %B} {now.day}, {now.year}"
+    return tod, pretty_date
+
+@functools.lru_cache(maxsize=1)
+def _boston_clock(minute: int):
+    now = dt.datetime.now(BOSTON_TZ)
+    return (now, *greeting_for(now))
+
+def boston_now():
+    """Boston time, greeting and spoken date (memoized per minute)"""
+    return _boston_clock(int(time.time() // 60))
+
+# -------------------- CACHE --------------------
+def _cache_path(kind: str, key: str, ext: str = "txt") -> Path:
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return CACHE_DIR / kind / f"{digest}.{ext}"
+
+def _cache_get(path: Path, ttl: int, binary: bool = False) -> str | bytes | None:
+    """Cached text (or bytes) if present and younger than ttl seconds"""
+    if not CACHE_ENABLED:
+        return None
+    try:
+        if time.time() - path.stat().st_mtime < ttl:
+            return path.read_bytes() if binary else path.read_text(encoding="utf-8")
+    except OSError:
+        pass
+    return None
+
+def _cache_put(path: Path, data: str | bytes):
+    if not CACHE_ENABLED:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, data)
+    except OSError as e:
+        print(f"[debug] cache write failed for {path}: {e}", file=sys.stderr)
+
+def prune_caches():
+    """Delete cache entries past their TTL; _cache_get never reads them again,
+    so without this .cache/ grows by every page fetched"""
+    if not CACHE_ENABLED:
+        return
+    now = time.time()
+    for kind, ttl in (
+        ("extract", EXTRACT_CACHE_TTL),
+        ("html", EXTRACT_CACHE_TTL),
+        ("scripts", SCRIPT_CACHE_TTL),
+    ):
+        try:
+            entries = list((CACHE_DIR / kind).iterdir())
+        except OSError:
+            continue
+        for path in entries:
+            try:
+                if now - path.stat().st_mtime >= ttl:
+                    path.unlink()
+            except OSError:
+                pass
 
 # -------------------- FETCH / DEDUPE --------------------
 def is_newsworthy(title: str) -> bool:
     """Filter out non-news content"""
-    t = (title or "").lower()
-    return bool(t and not any(k in t for k in EXCLUDE))
+    return bool(title) and not (_EXCLUDE_RE and _EXCLUDE_RE.search(title))
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_RSS1 = "{http://purl.org/rss/1.0/}"
+_ENTRY_TAGS = ("item", _RSS1 + "item", _ATOM + "entry")
+
+def _lxml_entries(body: bytes):
+    """Yield (title, link, summary) for RSS 2.0/1.0 and Atom entries.
+
+    A streaming lxml parse that reads only the three fields we use; much
+    cheaper than feedparser's full normalisation. Raises on malformed XML.
+    """
+    from lxml import etree
+    for _, el in etree.iterparse(BytesIO(body), tag=_ENTRY_TAGS, resolve_entities=False, no_network=True):
+        if el.tag == _ATOM + "entry":
+            title = el.findtext(_ATOM + "title")
+            link = next((l.get("href") for l in el.iterfind(_ATOM + "link")
+                         if l.get("rel", "alternate") == "alternate"), None)
+            summary = el.findtext(_ATOM + "summary") or el.findtext(_ATOM + "content")
+        else:
+            ns = el.tag[:-len("item")]
+            title, link = el.findtext(ns + "title"), el.findtext(ns + "link")
+            summary = el.findtext(ns + "description")
+        el.clear()
+        yield title or "", link or "", summary or ""
+
+def _feedparser_entries(body: bytes, name: str):
+    """Lenient fallback for feeds lxml can't read (broken XML, odd formats)"""
+    import feedparser
+    # We only read title/link/summary and strip summary HTML ourselves, so
+    # skip feedparser's sanitizer and URI resolution passes
+    fp = feedparser.parse(body, sanitize_html=False, resolve_relative_uris=False)
+    if fp.bozo:
+        print(f"[warn] feed parse warning for {name}: {fp.bozo_exception}", file=sys.stderr)
+    for e in fp.entries:
+        yield e.get("title") or "", e.get("link") or "", e.get("summary") or e.get("description") or ""
+
+def _collect_items(entries, name: str) -> list[dict]:
+    """First LIMIT_PER newsworthy entries as item dicts (stops reading early)"""
+    from bs4 import BeautifulSoup
 
-def fetch_items():
-    """Fetch RSS items with better error handling"""
     items = []
-    for src in SOURCES:
-        name = src.get("name","Unknown")
-        rss  = src.get("rss","").strip()
-        if not rss:
-            continue
+    for title, link, summary in entries:
+        if len(items) >= LIMIT_PER: break
+        title, link = title.strip(), link.strip()
+        if not title or not link: continue
+        if not is_newsworthy(title): continue
+        
+        # Clean HTML from summary (most are plain text: skip the parser then)
+        summary = summary.strip()
+        if "<" in summary:
+            summary = BeautifulSoup(summary, "lxml").get_text(" ", strip=True)
+        
+        items.append({
+            "source": name, 
+            "title": title, 
+            "link": link, 
+            "summary": summary[:500]  # Limit summary length
+        })
+    return items
+
+def _feed_config_key(name: str) -> str:
+    """Fingerprint of the feeds.yml settings that shape a source's cached items"""
+    return hashlib.blake2b(orjson.dumps([name, LIMIT_PER, sorted(EXCLUDE)]), digest_size=8).hexdigest()
+
+def _fetch_feed(src, cached: dict | None = None) -> tuple[list[dict], dict | None]:
+    """Download and parse one RSS source (runs in a worker thread).
+
+    Sends a conditional GET using the cached ETag/Last-Modified; on 304 the
+    cached items are reused. Returns (items, cache entry to keep).
+    """
+    name = src.get("name","Unknown")
+    rss  = src.get("rss","").strip()
+    if not rss:
+        return [], None
+    
+    # Cached items were filtered and labelled under the config of the run that
+    # stored them; after a feeds.yml edit, refetch in full instead of trusting a 304
+    config = _feed_config_key(name)
+    if cached and cached.get("config") != config:
+        cached = None
+    
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("modified"):
+            headers["If-Modified-Since"] = cached["modified"]
+    
+    try:
+        r = _HTTP.get(rss, timeout=20, headers=headers)
+        if r.status_code == 304 and cached:
+            print(f"[diag] {name}: not modified, reusing {len(cached['items'])} cached items")
+            return cached["items"], cached
+        r.raise_for_status()
+        
+        # Parse the downloaded bytes (no network inside the parsers): lxml fast
+        # path first, feedparser when the XML is broken or yields nothing
         try:
-            # Add timeout and better user agent
-            fp = feedparser.parse(rss, agent='Mozilla/5.0 (compatible; BostonBriefing/2.0)')
-            if fp.bozo:
-                print(f"[warn] feed parse warning for {name}: {fp.bozo_exception}", file=sys.stderr)
-            
-            count = 0
-            for e in fp.entries:
-                if count >= LIMIT_PER: break
-                title = (e.get("title") or "").strip()
-                link  = (e.get("link") or "").strip()
-                if not title or not link: continue
-                if not is_newsworthy(title): continue
-                
-                # Clean HTML from summary
-                summary = (e.get("summary") or e.get("description") or "").strip()
-                if summary:
-                    summary = BeautifulSoup(summary, "html.parser").get_text(" ", strip=True)
-                
-                items.append({
-                    "source": name, 
-                    "title": title, 
-                    "link": link, 
-                    "summary": summary[:500]  # Limit summary length
-                })
-                count += 1
+            items = _collect_items(_lxml_entries(r.content), name)
         except Exception as ex:
-            print(f"[warn] feed error {name}: {ex}", file=sys.stderr)
-    return items
+            print(f"[debug] lxml parse failed for {name} ({ex}), using feedparser", file=sys.stderr)
+            items = []
+        if not items:
+            items = _collect_items(_feedparser_entries(r.content, name), name)
+    except Exception as ex:
+        print(f"[warn] feed error {name}: {ex}", file=sys.stderr)
+        return [], cached
+    
+    entry = {"etag": r.headers.get("ETag"), "modified": r.headers.get("Last-Modified"),
+             "config": config, "items": items}
+    return items, entry if (entry["etag"] or entry["modified"]) else None
 
-def dedupe(items, threshold=85):
-    """Improved deduplication with lower threshold for better duplicate detection"""
-    kept, seen = [], []
+def fetch_items():
+    """Fetch all RSS sources concurrently; results keep feeds.yml order"""
+    if not SOURCES:
+        return []
+    
+    cache_path = CACHE_DIR / "feeds.json"
+    cache = {}
+    if CACHE_ENABLED:
+        try:
+            cache = orjson.loads(cache_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            pass
+    
+    rss_urls = [src.get("rss","").strip() for src in SOURCES]
+    with ThreadPoolExecutor(max_workers=min(16, len(SOURCES))) as pool:
+        results = list(pool.map(_fetch_feed, SOURCES, [cache.get(u) for u in rss_urls]))
+    
+    _cache_put(cache_path, orjson.dumps({
+        u: entry for u, (_, entry) in zip(rss_urls, results) if entry
+    }).decode("utf-8"))
+    return [it for items, _ in results for it in items]
+
+def _title_minhash(title: str, num_perm: int = 64):
+    """MinHash over the word shingles of an already-normalized headline"""
+    from datasketch import MinHash
+    m = MinHash(num_perm=num_perm)
+    for w in title.split():
+        m.update(w.encode("utf-8"))
+    return m
+
+def _dedupe_lsh(items, threshold=85):
+    """Near-linear dedupe: LSH buckets first, rapidfuzz only confirms bucket hits"""
+    try:
+        from datasketch import MinHashLSH
+    except ImportError:
+        print("[warn] datasketch not installed, falling back to pairwise dedupe", file=sys.stderr)
+        return None
+
+    lsh = MinHashLSH(threshold=0.7, num_perm=64)
+    kept, seen = [], {}
+    for i, it in enumerate(items):
+        title = default_process(it["title"])
+        m = _title_minhash(title)
+        bucket = lsh.query(m)
+        # score_cutoff lets rapidfuzz bail out early on hopeless pairs (returns 0);
+        # any() stops at the first confirmed duplicate
+        if any(fuzz.token_set_ratio(title, seen[k], score_cutoff=threshold) for k in bucket):
+            continue
+        key = str(i)
+        lsh.insert(key, m)
+        seen[key] = title
+        kept.append(it)
+    return kept
+
+def _drop_exact_titles(items):
+    """First occurrence of each normalized title (cheap set pass before fuzzy work)"""
+    seen, kept = set(), []
     for it in items:
-        title = it["title"]
-        if not seen:
+        title = default_process(it["title"])
+        if title not in seen:
+            seen.add(title)
             kept.append(it)
-            seen.append(title)
+    return kept
+
+def dedupe(items, threshold=85):
+    """Improved deduplication with lower threshold for better duplicate detection"""
+    # Wire copies syndicated across feeds are exact repeats: drop them before
+    # any fuzzy scoring (they'd score 100 anyway, so the result is the same)
+    items = _drop_exact_titles(items)
+    
+    # Pairwise matching is O(N^2); switch to MinHash LSH once the pool gets large
+    if len(items) >= LSH_MIN_ITEMS:
+        kept = _dedupe_lsh(items, threshold)
+        if kept is not None:
+            return kept
+
+    if not items:
+        return []
+    
+    # Preprocess once, then score every pair in a single vectorized C++ call
+    # instead of one extractOne() round-trip per title
+    titles = [default_process(it["title"]) for it in items]
+    scores = process.cdist(
+        titles, titles,
+        scorer=fuzz.token_set_ratio,
+        processor=None,
+        score_cutoff=threshold,
+        dtype=np.uint8,  # scores are 0-100: a quarter of the default int32 matrix
+        workers=-1
+    )
+    
+    # Keep a title only if it doesn't match any title we already kept
+    kept, kept_idx = [], []
+    for i, it in enumerate(items):
+        if kept_idx and scores[i, kept_idx].max() >= threshold:
             continue
-        match = process.extractOne(title, seen, scorer=fuzz.token_set_ratio)
-        if not match or match[1] < threshold:
-            kept.append(it)
-            seen.append(title)
+        kept_idx.append(i)
+        kept.append(it)
     return kept
 
 # -------------------- EXTRACTION --------------------
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+# Outermost text blocks in readability's cleaned article
+_TEXT_BLOCKS = "//*[self::p or self::h1 or self::h2 or self::h3 or self::li or self::blockquote][not(ancestor::p or ancestor::li or ancestor::blockquote)]"
+# Notes only need one 10-50 word sentence, so a short but clean trafilatura
+# result beats paying for a readability parse of the same page
+TRAF_MIN_WORDS = 15
+
+# Per-host trafilatura track record, persisted across runs. Hosts where it
+# almost always comes back empty go straight to readability; a small share of
+# their articles still tries trafilatura so a site redesign can win it back.
+TRAF_SKIP_MIN_TRIES = 5
+TRAF_SKIP_FAIL_RATE = 0.8
+TRAF_RETRY_SHARE    = 0.1
+_HOST_STATS_PATH = CACHE_DIR / "extractor_stats.json"
+_host_stats = None  # host -> [trafilatura_ok, trafilatura_fail]
+_host_stats_lock = threading.Lock()
+
+def _host_stat(host: str) -> list[int]:
+    """Mutable [ok, fail] counters for host; caller holds the lock"""
+    global _host_stats
+    if _host_stats is None:
+        _host_stats = {}
+        if CACHE_ENABLED:
+            try:
+                _host_stats = orjson.loads(_HOST_STATS_PATH.read_bytes())
+            except (OSError, orjson.JSONDecodeError):
+                pass
+    return _host_stats.setdefault(host, [0, 0])
+
+def _should_try_trafilatura(host: str) -> bool:
+    with _host_stats_lock:
+        ok, fail = _host_stat(host)
+    if ok + fail < TRAF_SKIP_MIN_TRIES or fail / (ok + fail) <= TRAF_SKIP_FAIL_RATE:
+        return True
+    return random.random() < TRAF_RETRY_SHARE
+
+def _record_trafilatura(host: str, ok: bool):
+    with _host_stats_lock:
+        _host_stat(host)[0 if ok else 1] += 1
+
+def save_extractor_stats():
+    """Persist the per-host counters (called once extraction is done)"""
+    with _host_stats_lock:
+        if _host_stats:
+            _cache_put(_HOST_STATS_PATH, orjson.dumps(_host_stats).decode("utf-8"))
+
+# Politeness cap per news host on top of the extraction pool's global 8
+EXTRACT_PER_HOST = int(os.getenv("EXTRACT_PER_HOST", "4"))
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+def _host_slot(host: str) -> threading.BoundedSemaphore:
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(EXTRACT_PER_HOST)
+        return _host_slots[host]
+
 def extract_text(url: str) -> str:
-    """Enhanced text extraction with better fallbacks"""
-    # 1) trafilatura first (best for news) - FIXED: removed timeout parameter
+    """Article text for url, served from the on-disk cache when fresh"""
+    path = _cache_path("extract", url)
+    cached = _cache_get(path, EXTRACT_CACHE_TTL)
+    if cached is not None:
+        return cached
+    
+    text = _extract_text(url)
+    if text:
+        _cache_put(path, text)
+    return text
+
+@functools.lru_cache(maxsize=1)
+def _trafilatura_config():
+    """Shared trafilatura config, built once instead of per extract() call"""
+    from trafilatura.settings import use_config
+    cfg = use_config()
+    cfg.set("DEFAULT", "MIN_EXTRACTED_SIZE", "200")
+    # The signal-based timeout only works on the main thread; extraction runs in a pool
+    cfg.set("DEFAULT", "EXTRACTION_TIMEOUT", "0")
+    return cfg
+
+def _download_html(url: str) -> bytes | None:
+    """Article HTML bytes, served from the raw-page cache when fresh"""
+    # Pages whose text couldn't be extracted never reach the text cache; this
+    # keeps them (and extractor tweaks during debugging) off the network
+    path = _cache_path("html", url, "html")
+    cached = _cache_get(path, EXTRACT_CACHE_TTL, binary=True)
+    if cached is not None:
+        return cached
+    
+    headers = {"Accept": "text/html,application/xhtml+xml"}
     try:
-        downloaded = trafilatura.fetch_url(url)  # Removed timeout parameter
-        if downloaded:
-            extracted = trafilatura.extract(
-                downloaded, 
-                include_comments=False, 
-                include_tables=False,
-                deduplicate=True,
-                favor_precision=True
-            )
-            if extracted and len(extracted.split()) > 40:
-                return extracted
+        with _host_slot(urlsplit(url).hostname or ""):
+            r = _HTTP.get(url, timeout=20, headers=headers, allow_redirects=True)
+        r.raise_for_status()
     except Exception as e:
-        print(f"[debug] trafilatura failed for {url}: {e}", file=sys.stderr)
+        print(f"[debug] fetch failed for {url}: {e}", file=sys.stderr)
+        return None
     
-    # 2) readability fallback
+    # Skip PDFs, images, video pages etc. before paying for any parsing
+    ctype = r.headers.get("content-type", "").split(";")[0].strip().lower()
+    if ctype and ctype not in HTML_TYPES:
+        print(f"[debug] skipping {ctype} for {url}", file=sys.stderr)
+        return None
+    
+    _cache_put(path, r.content)
+    return r.content
+
+_WORD_RE = re.compile(r"\S+")
+
+def _has_words(text: str, n: int) -> bool:
+    """At least n words, without splitting the whole (possibly long) text"""
+    return sum(1 for _ in islice(_WORD_RE.finditer(text), n)) >= n
+
+def _readability_text(downloaded: bytes, url: str) -> str:
+    """Fallback extractor: readability's article body, filtered line by line"""
+    from readability import Document
+    from lxml import html as lxml_html
+
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (compatible; BostonBriefing/2.0)",
-            "Accept": "text/html,application/xhtml+xml"
-        }
-        r = requests.get(url, timeout=20, headers=headers, allow_redirects=True)
-        r.raise_for_status()
-        
-        doc = Document(r.text)
-        text = BeautifulSoup(doc.summary(), "html.parser").get_text("\n", strip=True)
+        doc = Document(downloaded)
+        # One line per text block, read straight off lxml's tree: inline tags
+        # (<a>, <em>) no longer split a sentence across lines, and nothing
+        # outside paragraphs/headings/list items is visited
+        tree = lxml_html.fromstring(doc.summary())
+        blocks = tree.xpath(_TEXT_BLOCKS)
+        text = "\n".join(b.text_content() for b in blocks) if blocks else "\n".join(tree.itertext())
         
         # Better line filtering
         lines = []
@@ -152,193 +506,321 @@ def extract_text(url: str) -> str:
         print(f"[debug] readability failed for {url}: {e}", file=sys.stderr)
         return ""
 
+def _extract_text(url: str) -> str:
+    """Enhanced text extraction with better fallbacks (one download, two extractors)"""
+    import trafilatura
+
+    # Raw bytes: both extractors sniff the charset themselves
+    downloaded = _download_html(url)
+    if not downloaded:
+        return ""
+    
+    # 1) trafilatura first (best for news), unless this host keeps defeating it.
+    # no_fallback: its internal readability/justext fallbacks would only repeat
+    # the readability pass below
+    host = urlsplit(url).hostname or ""
+    if _should_try_trafilatura(host):
+        try:
+            extracted = trafilatura.extract(
+                downloaded, 
+                url=url,
+                config=_trafilatura_config(),
+                include_comments=False, 
+                include_tables=False,
+                deduplicate=True,
+                favor_precision=True,
+                no_fallback=True
+            )
+            ok = bool(extracted) and _has_words(extracted, TRAF_MIN_WORDS)
+            _record_trafilatura(host, ok)
+            if ok:
+                return extracted
+        except Exception as e:
+            _record_trafilatura(host, False)
+            print(f"[debug] trafilatura failed for {url}: {e}", file=sys.stderr)
+    
+    # 2) readability fallback on the same download
+    return _readability_text(downloaded, url)
+
+# Sentence ends (keeps the punctuation with the sentence) or spaced dashes
+_SENT_RE = re.compile(r"(?<=[.?!])\s+|\s+[—–]\s+")
+
+def _iter_sentences(text: str):
+    """Yield sentence-ish chunks one separator match at a time"""
+    start = 0
+    for m in _SENT_RE.finditer(text):
+        yield text[start:m.start()]
+        start = m.end()
+    yield text[start:]
+
 def first_sentence(text: str) -> str:
     """Extract clean first sentence with better parsing"""
-    # Clean up text first
-    text = " ".join(text.split())
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Try to find a good sentence
-    for sep in [". ", "? ", "! ", " — ", " – "]:
-        if sep in text:
-            parts = text.split(sep)
-            for part in parts:
-                part = part.strip(".•–—!? ")
-                if 10 <= len(part.split()) <= 50:  # Good sentence length
-                    return part
-    
-    # Fallback: first 200 chars
-    if len(text) > 200:
-        return text[:200].rsplit(" ", 1)[0].strip(".•–—!? ") + "..."
-    return text.strip(".•–—!? ")
-
-def build_notes(items):
-    """Build story notes with better quality control"""
-    notes, used = [], 0
+    # Scan the raw text lazily and only clean up the chunks we look at, so a
+    # long article is never normalized as a whole
+    for part in _iter_sentences(text):
+        part = " ".join(part.split()).strip(".•–—!? ")
+        if 10 <= len(part.split()) <= 50:  # Good sentence length
+            return part
     
+    # Fallback: first 200 chars, cut on a word boundary
+    head = " ".join(text[:1000].split())
+    return textwrap.shorten(head.strip(".•–—!? "), width=200, placeholder="...")
+
+SOURCE_PRIORITY = ["The Boston Globe", "Boston.com", "The Boston Globe Business"]
+_PRIO = {name: i for i, name in enumerate(SOURCE_PRIORITY)}
+
+def _extract_all(items, window):
+    """Yield (item, text) in order, extracting each window of links in parallel"""
+    pool = ThreadPoolExecutor(max_workers=8)
+    try:
+        for start in range(0, len(items), window):
+            batch = items[start:start + window]
+            yield from zip(batch, pool.map(extract_text, [it["link"] for it in batch]))
+    finally:
+        # Once the caller has enough notes, don't block script generation on
+        # straggler downloads: they finish in the background (and still fill
+        # the extraction cache) while OpenAI is already working
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _iter_notes(items):
+    """Yield formatted notes in priority order, skipping stories too thin to use"""
     # Sort by source priority (Globe first, then Boston.com)
-    priority_order = ["The Boston Globe", "Boston.com", "The Boston Globe Business"]
-    items_sorted = sorted(items, key=lambda x: (
-        priority_order.index(x['source']) if x['source'] in priority_order else 99,
-        x['title']
-    ))
-    
-    for it in items_sorted:
-        if used >= MAX_ITEMS: 
-            break
-            
-        txt = extract_text(it["link"])
+    items_sorted = sorted(items, key=lambda x: (_PRIO.get(x['source'], 99), x['title']))
+    
+    for it, txt in _extract_all(items_sorted, window=max(2, MAX_ITEMS * 2)):
         if not txt:
             # Use summary as fallback
             txt = it.get("summary") or it["title"]
         
-        sent = first_sentence(txt)
-        if len(sent.split()) < 8:
+        words = first_sentence(txt).split()
+        if len(words) < 8:
             continue
+        sent = " ".join(words[:NOTE_MAX_WORDS])
             
         # Format: clean sentence with source and link
-        notes.append(f"{it['source']}: {sent}  (link: {it['link']})")
-        used += 1
-        
+        yield f"{it['source']}: {sent}  (link: {it['link']})"
+
+def build_notes(items):
+    """Build story notes with better quality control"""
+    # islice stops right after the MAX_ITEMS-th note, so we never block on
+    # the next extraction
+    notes = list(islice(_iter_notes(items), MAX_ITEMS))
+    save_extractor_stats()
+    prune_caches()
     print(f"[diag] built {len(notes)} quality notes from {len(items)} items")
     return notes
 
 # -------------------- OPENAI --------------------
-try:
-    from openai import OpenAI
-    _client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
-except Exception as e:
-    print(f"[warn] openai import failed: {e}", file=sys.stderr)
-    _client = None
-
-def rewrite_with_openai(prompt_text: str, notes: list[str]) -> str | None:
-    """Enhanced OpenAI generation with better prompting"""
-    if not _client or not OPENAI_MODEL:
-        print("[diag] OpenAI client/model missing")
-        return None
+_client = None
+# Caps concurrent requests (primary/fallback race, API server) under the rate limit
+_openai_slots = threading.BoundedSemaphore(OPENAI_MAX_INFLIGHT)
 
-    now, tod, pretty_date = boston_now()
-    
-    # Enhanced system prompt for better output
-    sys_preamble = (
-        "You are writing a professional news briefing script for audio delivery.\n\n"
-        "CRITICAL REQUIREMENTS:\n"
-        f"1. Opening MUST be exactly: 'Good {tod}, it's {pretty_date}.'\n"
-        "2. Write 300-450 words total (2-3 minute read time).\n"
-        "3. Include 5-8 stories, 2-4 sentences each.\n"
-        "4. Lead with the most impactful LOCAL news story.\n"
-        "5. Use smooth, logical transitions. NEVER say stories are 'related' unless "
-        "they actually are. Default to 'Meanwhile,' 'In other news,' or 'Turning to [topic].'\n"
-        "6. Natural attribution: mention source once, then continue without repeating.\n"
-        "7. Professional broadcast tone - confident and conversational.\n"
-        "8. End with brief weather and the required beta disclaimer.\n"
-        "9. NO editorializing, sympathy expressions, or personal commentary.\n"
-        "10. Write for AUDIO - use natural speech patterns and rhythm.\n"
-    )
+def init_openai():
+    """Create the shared OpenAI client on first use (the SDK import is slow)"""
+    global _client
+    if _client is None and OPENAI_API_KEY:
+        try:
+            from openai import OpenAI
+            # The SDK retries 429/5xx/connection errors with exponential backoff
+            # and honours Retry-After; one more attempt than its default
+            _client = OpenAI(api_key=OPENAI_API_KEY, max_retries=3, timeout=OPENAI_TIMEOUT)
+        except Exception as e:
+            print(f"[warn] openai import failed: {e}", file=sys.stderr)
+    return _client
+
+# Enhanced system prompt for better output (only the greeting varies per run)
+_SYSTEM_PROMPT = (
+    "You are writing a professional news briefing script for audio delivery.\n\n"
+    "CRITICAL REQUIREMENTS:\n"
+    "1. Opening MUST be exactly: 'Good {tod}, it's {pretty_date}.'\n"
+    "2. Write 300-450 words total (2-3 minute read time).\n"
+    "3. Include 5-8 stories, 2-4 sentences each.\n"
+    "4. Lead with the most impactful LOCAL news story.\n"
+    "5. Use smooth, logical transitions. NEVER say stories are 'related' unless "
+    "they actually are. Default to 'Meanwhile,' 'In other news,' or 'Turning to [topic].'\n"
+    "6. Natural attribution: mention source once, then continue without repeating.\n"
+    "7. Professional broadcast tone - confident and conversational.\n"
+    "8. End with brief weather and the required beta disclaimer.\n"
+    "9. NO editorializing, sympathy expressions, or personal commentary.\n"
+    "10. Write for AUDIO - use natural speech patterns and rhythm.\n"
+)
+
+def _build_prompt(prompt_text: str, notes: list[str], now: dt.datetime | None = None) -> list[dict]:
+    """Build the chat messages once so the fallback model reuses them"""
+    tod, pretty_date = greeting_for(now or boston_now()[0])
+    sys_preamble = _SYSTEM_PROMPT.format_map({"tod": tod, "pretty_date": pretty_date})
+    
+    notes_block = "\n\n".join(notes)
+    if len(notes_block) > NOTES_MAX_CHARS:
+        # Drop whole notes rather than cutting one mid-sentence
+        notes_block = notes_block[:NOTES_MAX_CHARS].rsplit("\n\n", 1)[0]
     
     user_block = (
         "Create a polished audio script from these story notes:\n\n" + 
-        "\n\n".join(notes) +
+        notes_block +
         "\n\nRemember: This is for audio delivery. Make it sound natural when read aloud."
     )
     
-    try:
-        # Try with the specified model
-        messages = [
-            {"role": "system", "content": sys_preamble},
-            {"role": "user", "content": f"{prompt_text.strip()}\n\n{user_block}"}
-        ]
-        
-        resp = _client.chat.completions.create(
-            model=OPENAI_MODEL,
+    return [
+        {"role": "system", "content": sys_preamble},
+        {"role": "user", "content": f"{prompt_text.strip()}\n\n{user_block}"}
+    ]
+
+def _chat_completion(model: str, messages: list[dict], client_options: dict | None = None, **extra) -> str:
+    """Single chat completion call; raises on API errors"""
+    client = _client.with_options(**client_options) if client_options else _client
+    with _openai_slots:
+        resp = client.chat.completions.create(
+            model=model,
             messages=messages,
             # temperature=0.3,  # REMOVED - not supported by some models
             max_completion_tokens=1200,
-            presence_penalty=0.3,
-            frequency_penalty=0.3
+            **extra
         )
-        
-        script = (resp.choices[0].message.content or "").strip()
-        
-        # Validate output
-        if script and len(script.split()) > 50:
-            return script
-        else:
-            print(f"[warn] Script too short ({len(script.split())} words), retrying...")
-            return None
-            
+    return (resp.choices[0].message.content or "").strip()
+
+def _generate(model: str, messages: list[dict], **extra) -> str | None:
+    """One generation attempt; None on API error or unusable output"""
+    try:
+        script = _chat_completion(model, messages, **extra)
     except Exception as e:
-        print(f"[warn] OpenAI generation failed: {e}", file=sys.stderr)
-        # Try fallback with gpt-4o-mini
-        try:
-            print("[diag] trying fallback with gpt-4o-mini...")
-            resp = _client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=messages,
-                # temperature=0.3,  # REMOVED - not supported
-                max_completion_tokens=1200
-            )
-            script = (resp.choices[0].message.content or "").strip()
-            if script and len(script.split()) > 50:
-                return script
-        except Exception as e2:
-            print(f"[warn] Fallback also failed: {e2}", file=sys.stderr)
+        print(f"[warn] OpenAI generation failed ({model}): {e}", file=sys.stderr)
         return None
+    
+    # Validate output
+    word_count = len(script.split())
+    if word_count > 50:
+        return script
+    print(f"[warn] Script too short from {model} ({word_count} words)")
+    return None
+
+def _generate_with_fallback(messages: list[dict]) -> str | None:
+    """Primary model's script; the fallback model only if the primary fails"""
+    # The primary's deadline is enforced by the SDK request timeout, so a slow
+    # call is abandoned rather than left running (and holding a slot) in the
+    # background. Only then is the cheaper model asked, so normal runs pay for
+    # one completion and always publish the primary's script.
+    script = _generate(
+        OPENAI_MODEL, messages,
+        client_options={"timeout": OPENAI_BACKUP_DELAY, "max_retries": 1},
+        presence_penalty=0.3, frequency_penalty=0.3
+    )
+    if script or OPENAI_FALLBACK_MODEL in ("", OPENAI_MODEL):
+        return script
+
+    print(f"[diag] starting fallback with {OPENAI_FALLBACK_MODEL}...")
+    return _generate(OPENAI_FALLBACK_MODEL, messages)
+
+def rewrite_with_openai(prompt_text: str, notes: list[str], now: dt.datetime | None = None) -> str | None:
+    """Enhanced OpenAI generation with better prompting"""
+    if not init_openai() or not OPENAI_MODEL:
+        print("[diag] OpenAI client/model missing")
+        return None
+
+    messages = _build_prompt(prompt_text, notes, now)
+    
+    # Same model + prompt + notes (e.g. a CI retry) -> reuse the last script.
+    # The messages embed the greeting and date, so this never crosses a day.
+    cache_path = _cache_path("scripts", OPENAI_MODEL + "\n" + orjson.dumps(messages).decode())
+    cached = _cache_get(cache_path, SCRIPT_CACHE_TTL)
+    if cached:
+        print("[diag] reusing cached script for identical prompt and notes")
+        return cached
+    
+    script = _generate_with_fallback(messages)
+    if script:
+        _cache_put(cache_path, script)
+    return script
 
 # -------------------- TTS SANITIZER --------------------
+# Fix punctuation for better prosody
+TTS_REPLACEMENTS = {
+    "—": ", ",
+    "–": ", ",
+    " / ": " or ",
+    "&": " and ",
+    "%": " percent",
+    "$": " dollars ",
+    "24/7": "twenty four seven",
+    "9/11": "nine eleven",
+    '"': "",  # Clean up quotes for speech
+}
+
+# Expand common Boston acronyms
+TTS_ACRONYMS = {
+    "MBTA": "M-B-T-A",
+    "BPL": "Boston Public Library", 
+    "BPD": "Boston Police",
+    "BFD": "Boston Fire Department",
+    "MGH": "Mass General Hospital",
+    "MIT": "M-I-T",
+    "BU": "B-U",
+    "BC": "B-C",
+    "CEO": "C-E-O",
+    "FBI": "F-B-I",
+    "COVID": "covid"
+}
+
+def _alternation(words) -> str:
+    # Longest first so e.g. "24/7" wins over any shorter overlapping token
+    return "|".join(map(re.escape, sorted(words, key=len, reverse=True)))
+
+# Every substitution in one alternation: the script is walked once and the
+# callback dispatches on whichever named group matched
+_TTS_RE = re.compile(
+    r"(?P<url>https?://\S+)"
+    r"|(?P<email>\S+@\S+\.\S+)"
+    r"|(?P<dots>[.…]{2,}|…)"
+    r"|(?P<acronym>\b(?:" + _alternation(TTS_ACRONYMS) + r")\b)"
+    r"|(?P<token>" + _alternation(TTS_REPLACEMENTS) + r")"
+)
+_WS_RE  = re.compile(r'\s+')
+_CAP_RE = re.compile(r'([.!?])\s*([a-z])')
+
+def _tts_sub(m: re.Match) -> str:
+    kind = m.lastgroup
+    if kind in ("url", "email"):
+        return ""
+    if kind == "dots":
+        return "."
+    if kind == "acronym":
+        return TTS_ACRONYMS[m.group()]
+    return TTS_REPLACEMENTS[m.group()]
+
 def sanitize_for_tts(s: str) -> str:
     """Enhanced sanitization for natural TTS delivery"""
-    # Remove URLs and email addresses
-    s = re.sub(r'https?://\S+', '', s)
-    s = re.sub(r'\S+@\S+\.\S+', '', s)
-    
-    # Fix punctuation for better prosody
-    replacements = [
-        ("—", ", "),
-        ("–", ", "),
-        ("…", "."),
-        ("...", "."),
-        (" / ", " or "),
-        ("&", " and "),
-        ("%", " percent"),
-        ("$", " dollars "),
-        ("24/7", "twenty four seven"),
-        ("9/11", "nine eleven"),
-    ]
-    for old, new in replacements:
-        s = s.replace(old, new)
-    
-    # Expand common Boston acronyms
-    acronyms = {
-        "MBTA": "M-B-T-A",
-        "BPL": "Boston Public Library", 
-        "BPD": "Boston Police",
-        "BFD": "Boston Fire Department",
-        "MGH": "Mass General Hospital",
-        "MIT": "M-I-T",
-        "BU": "B-U",
-        "BC": "B-C",
-        "CEO": "C-E-O",
-        "FBI": "F-B-I",
-        "COVID": "covid"
-    }
-    for acronym, expansion in acronyms.items():
-        s = re.sub(r'\b' + acronym + r'\b', expansion, s)
+    # URLs/emails, punctuation, acronyms, ellipses and quotes in one pass
+    s = _TTS_RE.sub(_tts_sub, s)
     
     # Fix problematic patterns
-    s = re.sub(r'\.{2,}', '.', s)  # Multiple periods
-    s = re.sub(r'\s+', ' ', s)  # Multiple spaces
-    s = re.sub(r'([.!?])\s*([a-z])', lambda m: m.group(1) + ' ' + m.group(2).upper(), s)  # Capitalize after sentence
-    
-    # Clean up quotes for speech
-    s = s.replace('"', '').replace("'", "'")
+    s = _WS_RE.sub(' ', s)  # Multiple spaces
+    s = _CAP_RE.sub(lambda m: m.group(1) + ' ' + m.group(2).upper(), s)  # Capitalize after sentence
     
     return s.strip()
 
 # -------------------- OPTIMIZED TTS --------------------
-def tts_elevenlabs(text: str) -> bytes | None:
+TTS_MAX_ATTEMPTS = 3
+TTS_MAX_BACKOFF  = 30  # seconds; cap on a server-supplied Retry-After
+
+def _post_tts(url: str, headers: dict, payload: dict) -> requests.Response:
+    """POST to ElevenLabs, retrying 429/5xx with backoff (Retry-After when given)"""
+    for attempt in range(TTS_MAX_ATTEMPTS):
+        r = _HTTP.post(url, headers=headers, data=orjson.dumps(payload), timeout=120, stream=True)
+        if (r.status_code != 429 and r.status_code < 500) or attempt == TTS_MAX_ATTEMPTS - 1:
+            return r
+        try:
+            delay = min(float(r.headers.get("Retry-After", "")), TTS_MAX_BACKOFF)
+        except ValueError:
+            delay = 2 ** attempt + random.random()
+        r.close()
+        print(f"[diag] ElevenLabs returned {r.status_code}, retrying in {delay:.1f}s...")
+        time.sleep(delay)
+
+def tts_elevenlabs(text: str, out_path: Path) -> int | None:
     """
     OPTIMIZED TTS - Maximum safe expression for cloned voices
+
+    Streams the MP3 straight into out_path and returns its size in bytes.
     """
     if not ELEVEN_API_KEY or not ELEVEN_VOICE_ID or not text.strip():
         print("[diag] skipping TTS; missing ELEVEN_API_KEY/VOICE_ID or empty text")
@@ -346,8 +828,9 @@ def tts_elevenlabs(text: str) -> bytes | None:
 
     base = f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVEN_VOICE_ID}"
     
-    # High quality output with streaming optimization disabled for best quality
-    url = f"{base}?output_format=mp3_44100_128&optimize_streaming_latency=0"
+    # /stream sends audio as it is synthesized, so the download overlaps
+    # generation; latency optimizations stay off for best quality
+    url = f"{base}/stream?output_format=mp3_44100_128&optimize_streaming_latency=0"
 
     payload = {
         "text": text,
@@ -363,27 +846,42 @@ def tts_elevenlabs(text: str) -> bytes | None:
     headers = {
         "xi-api-key": ELEVEN_API_KEY,
         "accept": "audio/mpeg",
+        "accept-encoding": "identity",  # MP3 is already compressed; skip gzip on the stream
         "content-type": "application/json"
     }
 
     try:
         print("[diag] sending to ElevenLabs TTS...")
-        r = requests.post(url, headers=headers, json=payload, timeout=120)
+        r = _post_tts(url, headers, payload)
         
         if r.status_code >= 400:
             print(f"[error] ElevenLabs error {r.status_code}: {r.text[:500]}", file=sys.stderr)
+            r.close()
             
             # Try fallback settings if main settings fail
-            if r.status_code == 400:
-                print("[diag] trying fallback TTS settings...")
-                payload["voice_settings"]["stability"] = 0.75
-                payload["voice_settings"]["style"] = 0.0
-                r = requests.post(url, headers=headers, json=payload, timeout=120)
-                
-                if r.status_code >= 400:
-                    return None
+            if r.status_code != 400:
+                return None
+            print("[diag] trying fallback TTS settings...")
+            payload["voice_settings"]["stability"] = 0.75
+            payload["voice_settings"]["style"] = 0.0
+            r = _post_tts(url, headers, payload)
+            
+            if r.status_code >= 400:
+                r.close()
+                return None
+        
+        # Write chunks as they arrive instead of buffering the whole MP3, into a
+        # .part file so the published episode is never seen half-written
+        part = out_path.with_suffix(out_path.suffix + ".part")
+        try:
+            with r, open(part, "wb") as f:
+                for chunk in r.iter_content(chunk_size=65536):
+                    f.write(chunk)
+        except Exception:
+            part.unlink(missing_ok=True)
+            raise
         
-        audio_size = len(r.content)
+        audio_size = part.stat().st_size
         print(f"[success] ✅ Natural TTS generated: {audio_size:,} bytes")
         
         # Validate audio size (should be roughly 10-30 KB per second of speech)
@@ -395,11 +893,13 @@ def tts_elevenlabs(text: str) -> bytes | None:
             # Check if it's an error response
             if audio_size < 1000:
                 print("[error] TTS failed - response too small to be valid audio")
+                part.unlink(missing_ok=True)
                 return None
         elif audio_size > expected_max:
             print(f"[warn] Audio suspiciously large ({audio_size} bytes)")
-            
-        return r.content
+        
+        os.replace(part, out_path)
+        return audio_size
         
     except requests.exceptions.Timeout:
         print(f"[error] ElevenLabs request timed out", file=sys.stderr)
@@ -409,56 +909,102 @@ def tts_elevenlabs(text: str) -> bytes | None:
         return None
 
 # -------------------- OUTPUT (SITE/FEED) --------------------
+# Rendered once per run with str.format_map (CSS braces are doubled)
+_SHOWNOTES_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Boston Briefing – {date_str}</title>
+<style>
+body {{ font-family: system-ui, -apple-system, sans-serif; max-width: 800px; margin: 40px auto; padding: 0 20px; line-height: 1.6; }}
+h1 {{ color: #1a1a1a; border-bottom: 2px solid #e0e0e0; padding-bottom: 10px; }}
+ol {{ padding-left: 20px; }}
+li {{ margin: 12px 0; }}
+a {{ color: #0066cc; text-decoration: none; }}
+a:hover {{ text-decoration: underline; }}
+.source {{ color: #666; font-weight: 500; }}
+.date {{ color: #999; font-size: 0.9em; }}
+</style>
+</head>
+<body>
+<h1>Boston Briefing – {date_str}</h1>
+<p class="date">Sources for today's briefing:</p>
+<ol>
+{items}
+</ol>
+<p style="margin-top: 40px; padding-top: 20px; border-top: 1px solid #e0e0e0; color: #666; font-size: 0.9em;">
+This is an AI-generated news briefing. All stories are sourced from legitimate Boston news outlets.
+</p>
+</body>
+</html>"""
+
+_SHOWNOTES_ITEM = (
+    '<li><a href="{link}" target="_blank" rel="noopener">{title}</a> '
+    '<span class="source">– {source}</span></li>'
+)
+
+_FEED_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+  <channel>
+    <title>{title}</title>
+    <link>{link}</link>
+    <language>en-us</language>
+    <description>{desc}</description>
+    <itunes:author>Boston Briefing</itunes:author>
+    <itunes:summary>AI-powered daily Boston news updates. Written by GPT, voiced by an AI clone.</itunes:summary>
+    <itunes:category text="News">
+      <itunes:category text="Daily News"/>
+    </itunes:category>
+    <itunes:explicit>false</itunes:explicit>
+    <itunes:type>episodic</itunes:type>
+    <lastBuildDate>{last_build}</lastBuildDate>
+    <item>
+      <title>{item_title}</title>
+      <description>Today's Boston news: top stories from The Boston Globe, Boston.com, and other local sources.</description>
+      <link>{episode_url}</link>
+      <guid isPermaLink="false">{guid}</guid>
+      <pubDate>{last_build}</pubDate>
+      {enclosure}
+      <itunes:duration>180</itunes:duration>
+      <itunes:episodeType>full</itunes:episodeType>
+    </item>
+  </channel>
+</rss>"""
+
+def atomic_write(path: Path, data: str | bytes):
+    """Write via a sibling .tmp file so readers never see a half-written document"""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    if isinstance(data, bytes):
+        tmp.write_bytes(data)
+    else:
+        tmp.write_text(data, encoding="utf-8")
+    os.replace(tmp, path)
+
+def write_if_changed(path: Path, data: str) -> bool:
+    """atomic_write, skipped when the file already holds exactly this content
+    (keeps mtimes stable so Pages/CDN caches aren't invalidated for nothing)"""
+    try:
+        if path.read_text(encoding="utf-8") == data:
+            return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    atomic_write(path, data)
+    return True
+
 def write_shownotes(date_str, items):
     """Generate clean shownotes HTML"""
-    html = [
-        '<!DOCTYPE html>',
-        '<html lang="en">',
-        '<head>',
-        '<meta charset="utf-8">',
-        '<meta name="viewport" content="width=device-width, initial-scale=1">',
-        f'<title>Boston Briefing – {date_str}</title>',
-        '<style>',
-        'body { font-family: system-ui, -apple-system, sans-serif; max-width: 800px; margin: 40px auto; padding: 0 20px; line-height: 1.6; }',
-        'h1 { color: #1a1a1a; border-bottom: 2px solid #e0e0e0; padding-bottom: 10px; }',
-        'ol { padding-left: 20px; }',
-        'li { margin: 12px 0; }',
-        'a { color: #0066cc; text-decoration: none; }',
-        'a:hover { text-decoration: underline; }',
-        '.source { color: #666; font-weight: 500; }',
-        '.date { color: #999; font-size: 0.9em; }',
-        '</style>',
-        '</head>',
-        '<body>',
-        f'<h1>Boston Briefing – {date_str}</h1>',
-        f'<p class="date">Sources for today\'s briefing:</p>',
-        '<ol>'
-    ]
-    
-    count = 0
-    for it in items[:MAX_ITEMS]:
-        title = it['title'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        source = it['source'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        link = it['link'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        
-        html.append(
-            f'<li><a href="{link}" target="_blank" rel="noopener">{title}</a> '
-            f'<span class="source">– {source}</span></li>'
-        )
-        count += 1
-    
-    html.extend([
-        '</ol>',
-        '<p style="margin-top: 40px; padding-top: 20px; border-top: 1px solid #e0e0e0; color: #666; font-size: 0.9em;">',
-        'This is an AI-generated news briefing. All stories are sourced from legitimate Boston news outlets.',
-        '</p>',
-        '</body>',
-        '</html>'
-    ])
+    items_html = "\n".join(map(_SHOWNOTES_ITEM.format_map, (
+        {k: escape(it[k]) for k in ("title", "source", "link")}
+        for it in items[:MAX_ITEMS]
+    )))
     
     shownotes_path = SH_NOTES / f"{date_str}.html"
-    shownotes_path.write_text("\n".join(html), encoding="utf-8")
-    print(f"[diag] wrote shownotes: {shownotes_path}")
+    html = _SHOWNOTES_TEMPLATE.format_map({"date_str": date_str, "items": items_html})
+    if write_if_changed(shownotes_path, html):
+        print(f"[diag] wrote shownotes: {shownotes_path}")
+    else:
+        print(f"[diag] shownotes unchanged: {shownotes_path}")
 
 def write_index_if_missing():
     """Only create index if it doesn't exist"""
@@ -477,57 +1023,33 @@ def write_index_if_missing():
   <p>Podcast RSS: <a href="{url}">{url}</a></p>
   <p>Shownotes: <a href="shownotes/">Browse episodes</a></p>
 </body></html>"""
-    idx.write_text(html, encoding="utf-8")
+    atomic_write(idx, html)
 
-def build_feed(episode_url: str, filesize: int):
-    """Generate valid podcast RSS feed"""
+def build_feed(episode_url: str, filesize: int, now: dt.datetime):
+    """Generate valid podcast RSS feed (now: the run's Boston timestamp)"""
     title = "Boston Briefing"
     desc = "A short, factual Boston news briefing powered by AI."
     link = PUBLIC_BASE_URL or ""
     
-    now = dt.datetime.now().astimezone()
     last_build = format_datetime(now)
+    item_title = f"Boston Briefing – {now:%B} {now.day}, {now.year}"
+    guid = episode_url or f"boston-briefing-{now:%Y-%m-%d}"
     
-    # Use Boston time for the title
-    boston_now_time, _, _ = boston_now()
-    item_title = boston_now_time.strftime("Boston Briefing – %B %-d, %Y") if hasattr(boston_now_time.strftime, '%-d') else boston_now_time.strftime("Boston Briefing – %B %d, %Y").replace(' 0', ' ')
-    
-    guid = episode_url or f"boston-briefing-{boston_now_time.strftime('%Y-%m-%d')}"
-    
-    enclosure = f'<enclosure url="{episode_url}" length="{filesize}" type="audio/mpeg"/>' if episode_url else ""
-    
-    feed = [
-        '<?xml version="1.0" encoding="UTF-8"?>',
-        '<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd" xmlns:content="http://purl.org/rss/1.0/modules/content/">',
-        '  <channel>',
-        f'    <title>{title}</title>',
-        f'    <link>{link}</link>',
-        '    <language>en-us</language>',
-        f'    <description>{desc}</description>',
-        '    <itunes:author>Boston Briefing</itunes:author>',
-        '    <itunes:summary>AI-powered daily Boston news updates. Written by GPT, voiced by an AI clone.</itunes:summary>',
-        '    <itunes:category text="News">',
-        '      <itunes:category text="Daily News"/>',
-        '    </itunes:category>',
-        '    <itunes:explicit>false</itunes:explicit>',
-        '    <itunes:type>episodic</itunes:type>',
-        f'    <lastBuildDate>{last_build}</lastBuildDate>',
-        '    <item>',
-        f'      <title>{item_title}</title>',
-        f'      <description>Today\'s Boston news: top stories from The Boston Globe, Boston.com, and other local sources.</description>',
-        f'      <link>{episode_url}</link>',
-        f'      <guid isPermaLink="false">{guid}</guid>',
-        f'      <pubDate>{last_build}</pubDate>',
-        f'      {enclosure}',
-        '      <itunes:duration>180</itunes:duration>',
-        '      <itunes:episodeType>full</itunes:episodeType>',
-        '    </item>',
-        '  </channel>',
-        '</rss>'
-    ]
+    enclosure = f'<enclosure url="{escape(episode_url)}" length="{filesize}" type="audio/mpeg"/>' if episode_url else ""
+    
+    feed = _FEED_TEMPLATE.format_map({
+        "title": escape(title),
+        "link": escape(link),
+        "desc": escape(desc),
+        "last_build": last_build,
+        "item_title": escape(item_title),
+        "episode_url": escape(episode_url),
+        "guid": escape(guid),
+        "enclosure": enclosure,
+    })
     
     feed_path = PUBLIC_DIR / "feed.xml"
-    feed_path.write_text("\n".join(feed), encoding="utf-8")
+    atomic_write(feed_path, feed)
     print(f"[diag] wrote RSS feed: {feed_path}")
 
 # -------------------- MAIN --------------------
@@ -542,6 +1064,17 @@ def main():
     print(f"[config] Sources: {len(SOURCES)}")
     print(f"[config] TTS: {'ElevenLabs' if ELEVEN_API_KEY else 'Disabled'}")
     print(f"[config] Base URL: {'Set' if PUBLIC_BASE_URL else 'Not set'}")
+    print(f"[config] Cache: {'On' if CACHE_ENABLED else 'Off'}")
+    
+    # One clock read for the whole run: greeting, episode date, shownotes and
+    # feed all agree even if the run straddles a minute, hour or midnight
+    today, _, _ = boston_now()
+    date_str = today.strftime("%Y-%m-%d")
+    
+    # Importing the OpenAI SDK and building the client is slow; do it while
+    # feeds are fetched and articles extracted
+    background = ThreadPoolExecutor(max_workers=2)
+    openai_ready = background.submit(init_openai)
     
     # Fetch and process news
     print("\n[1/6] Fetching news feeds...")
@@ -568,11 +1101,19 @@ def main():
     else:
         print("\n[4/6] No prompt.txt found, using defaults")
     
+    # Shownotes and index only depend on the stories, so write them in the
+    # background while the (much slower) OpenAI call runs
+    site_jobs = [
+        background.submit(write_shownotes, date_str, deduped),
+        background.submit(write_index_if_missing),
+    ]
+    openai_ready.result()
+    
     # Generate script
     print("\n[5/6] Generating script with AI...")
-    script = None
+    script, word_count = None, 0
     if prompt_text.strip() and notes:
-        script = rewrite_with_openai(prompt_text, notes)
+        script = rewrite_with_openai(prompt_text, notes, today)
         if script:
             word_count = len(script.split())
             print(f"  → generated {word_count} words")
@@ -580,7 +1121,7 @@ def main():
             print("  → generation failed, using fallback")
     
     # Fallback if generation failed
-    if not script or len(script.split()) < 50:
+    if word_count < 50:
         print("[warn] Using fallback script")
         script = (
             "Good evening, this is the Boston Briefing. "
@@ -601,30 +1142,19 @@ def main():
     print(script)
     print("-"*40 + "\n")
     
-    # Generate output files
-    today = dt.datetime.now(ZoneInfo("America/New_York"))
-    date_str = today.strftime("%Y-%m-%d")
-    
-    write_shownotes(date_str, deduped)
-    write_index_if_missing()
-    
-    # Generate TTS
+    # Generate TTS straight into the episode file, then create feed
     print("\n[6/6] Generating audio with TTS...")
-    mp3_bytes = None
-    if ELEVEN_API_KEY:
-        mp3_bytes = tts_elevenlabs(script)
-    else:
-        print("  → TTS skipped (no API key)")
-    
-    # Save MP3 and create feed
     ep_url = ""
     filesize = 0
     ep_name = f"boston-briefing-{date_str}.mp3"
     ep_path = EP_DIR / ep_name
     
-    if mp3_bytes:
-        ep_path.write_bytes(mp3_bytes)
-        filesize = len(mp3_bytes)
+    if ELEVEN_API_KEY:
+        filesize = tts_elevenlabs(script, ep_path) or 0
+    else:
+        print("  → TTS skipped (no API key)")
+    
+    if filesize:
         ep_url = f"{PUBLIC_BASE_URL}/episodes/{ep_name}" if PUBLIC_BASE_URL else f"episodes/{ep_name}"
         print(f"  → saved {ep_name} ({filesize:,} bytes)")
         
@@ -634,12 +1164,18 @@ def main():
     else:
         print("  → no audio generated")
     
-    build_feed(ep_url, filesize)
+    # Shownotes/index have been writing since before generation; surface any
+    # error before publishing the feed
+    for job in site_jobs:
+        job.result()
+    background.shutdown()
+    
+    build_feed(ep_url, filesize, today)
     
     print("\n" + "="*60)
     print("✅ GENERATION COMPLETE!")
     print(f"📅 Episode: {date_str}")
-    print(f"🎙️ Audio: {'Generated' if mp3_bytes else 'Failed'}")
+    print(f"🎙️ Audio: {'Generated' if filesize else 'Failed'}")
     print(f"📝 Shownotes: shownotes/{date_str}.html")
     print(f"📡 RSS Feed: feed.xml")
     print("="*60 + "\n")